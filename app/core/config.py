@@ -40,6 +40,10 @@ class Settings(LLMConfigMixin, BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     LOG_LEVEL: str = "INFO"
+    # Skip FastAPI response_model validation on backtest routes (test runs only)
+    SKIP_RESPONSE_VALIDATION: bool = False
+    # DuckDB worker threads per connection
+    DUCKDB_THREADS: int = 4
 
     LLM_PROVIDER: Literal["openai", "gemini"] = "openai"
     LLM_MODEL: str = "gpt-4-turbo-preview"
@@ -4,6 +4,7 @@ import re
 import duckdb
 import pandas as pd
 
+from app.core.config import settings
 from app.core.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -12,20 +13,24 @@ logger = logging.getLogger(__name__)
 class DuckDBEngine:
     """High-performance analytical database engine using DuckDB with vectorized operations."""
 
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", threads: int | None = None):
         self.db_path = db_path
+        self.threads = threads if threads is not None else settings.DUCKDB_THREADS
         self._conn = None
         self._is_initialized = False
 
     def _initialize_connection(self):
         if self._conn is None:
             try:
-                self._conn = duckdb.connect(database=self.db_path, read_only=False)
+                self._conn = duckdb.connect(
+                    database=self.db_path,
+                    read_only=False,
+                    config={"threads": self.threads},
+                )
                 self._conn.execute("INSTALL httpfs;")
                 self._conn.execute("LOAD httpfs;")
                 self._conn.execute("INSTALL parquet;")
                 self._conn.execute("LOAD parquet;")
-                self._conn.execute("PRAGMA threads=4;")
 
                 logger.info(f"DuckDB engine initialized: {self.db_path}")
                 self._is_initialized = True
@@ -1,3 +1,8 @@
+ALLOWED_DATA_FIELDS = ("market_capitalization", "prices", "volume", "adtv_3_month")
+# Hashed lookup for the hot path; the tuple keeps the error message ordered
+_ALLOWED_DATA_FIELDS_SET = frozenset(ALLOWED_DATA_FIELDS)
+
+
 def validate_data_field(v: str) -> str:
     """
     Validate data_field against allowed values.
@@ -11,7 +16,8 @@ def validate_data_field(v: str) -> str:
     Raises:
         ValueError: If field is not in allowed list
     """
-    allowed_fields = ["market_capitalization", "prices", "volume", "adtv_3_month"]
-    if v not in allowed_fields:
-        raise ValueError(f"Invalid data_field: {v}. Must be one of {allowed_fields}")
+    if v not in _ALLOWED_DATA_FIELDS_SET:
+        raise ValueError(
+            f"Invalid data_field: {v}. Must be one of {list(ALLOWED_DATA_FIELDS)}"
+        )
     return v
@@ -1,9 +1,22 @@
 import os
 from datetime import date
+from types import MappingProxyType
+from unittest.mock import Mock
 
 import pandas as pd
 import pytest
 
+# Must be set before app.core.config is imported so Settings picks it up
+os.environ.setdefault("SKIP_RESPONSE_VALIDATION", "1")
+# Single-threaded DuckDB: test tables are tiny and xdist workers run side by side
+os.environ.setdefault("DUCKDB_THREADS", "1")
+
+# Canned DuckDBEngine results; treat as read-only and .copy() before mutating
+MOCK_DATA_RANGE = (pd.Timestamp("2020-01-01"), pd.Timestamp("2025-01-22"))
+MOCK_FILTERED_DATA = pd.DataFrame(
+    {"date": ["2024-01-01"], "security": ["AAPL"], "value": [100.0]}
+)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def ensure_test_data():
@@ -52,3 +65,43 @@ def sample_backtest_request():
         ),
         weighting_scheme=WeightingScheme(weighting_type="Equal"),
     )
+
+
+@pytest.fixture(scope="session")
+def valid_request_dict():
+    """Read-only BacktestRequest payload shared across test modules.
+
+    Only the top level is frozen; deepcopy before mutating nested sections.
+    """
+    return MappingProxyType(
+        {
+            "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2023-01-01"},
+            "portfolio_creation": {
+                "filter_type": "TopN",
+                "n": 10,
+                "data_field": "market_capitalization",
+            },
+            "weighting_scheme": {"weighting_type": "Equal"},
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def _session_db_engine():
+    """Build the DuckDBEngine spec mock once; spec introspection is not free."""
+    from app.db.duckdb_engine import DuckDBEngine
+
+    mock_engine = Mock(spec=DuckDBEngine)
+    mock_engine.get_data_range.return_value = MOCK_DATA_RANGE
+    mock_engine.filter_data_by_dates.return_value = MOCK_FILTERED_DATA
+    return mock_engine
+
+
+@pytest.fixture
+def mock_db_engine(_session_db_engine):
+    """Shared DuckDBEngine mock, restored to its canned configuration after each test."""
+    yield _session_db_engine
+    _session_db_engine.reset_mock(return_value=False, side_effect=True)
+    # reset_mock leaves child return values as the test left them; re-pin them
+    _session_db_engine.get_data_range.return_value = MOCK_DATA_RANGE
+    _session_db_engine.filter_data_by_dates.return_value = MOCK_FILTERED_DATA
@@ -1,13 +1,18 @@
+import importlib
 from datetime import date
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.api import routes
+from app.core.config import settings
 from app.core.exceptions import DataNotFoundError, PromptParsingError
 from app.main import app
 from app.schemas import (
     BacktestRequest,
+    BacktestResponse,
     CalendarRules,
     PerformanceMetrics,
     PortfolioCreation,
@@ -510,3 +515,32 @@ class TestApiEndpoints:
         response = client.post("/api/v1/backtest", data=malformed_json)
 
         assert response.status_code == 422  # JSON parse error
+
+
+class TestResponseValidation:
+    @pytest.fixture
+    def validating_routes(self, monkeypatch):
+        """Routes module re-imported with the production SKIP_RESPONSE_VALIDATION=False."""
+        monkeypatch.setattr(settings, "SKIP_RESPONSE_VALIDATION", False)
+        yield importlib.reload(routes)
+        monkeypatch.undo()
+        importlib.reload(routes)
+
+    def test_routes_declare_backtest_response(self, validating_routes):
+        """Test that production routes validate against BacktestResponse."""
+        paths = {route.path: route for route in validating_routes.router.routes}
+        for path in ("/backtest", "/backtest-prompt"):
+            assert paths[path].response_model is BacktestResponse
+
+    def test_openapi_includes_response_schema(self, validating_routes):
+        """Test that the OpenAPI schema builds with the response model attached."""
+        fresh_app = FastAPI()
+        fresh_app.include_router(validating_routes.router, prefix="/api/v1")
+
+        schema = fresh_app.openapi()
+
+        assert "BacktestResponse" in schema["components"]["schemas"]
+        ok = schema["paths"]["/api/v1/backtest"]["post"]["responses"]["200"]
+        assert ok["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/BacktestResponse"
+        }
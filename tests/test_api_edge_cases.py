@@ -1,24 +1,73 @@
+import asyncio
+import functools
+
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
 
 client = TestClient(app)
 
+LONG_PROMPT = "Run backtest " * 1000
+VALID_DATA_FIELDS = ["market_capitalization", "prices", "volume", "adtv_3_month"]
+INVALID_DATA_FIELDS = [
+    "profit",
+    "market_capitalization; DROP TABLE users;",
+    "../../../etc/passwd",
+]
+
+
+def pytest_generate_tests(metafunc):
+    if "bad_data_field" in metafunc.fixturenames:
+        metafunc.parametrize("bad_data_field", INVALID_DATA_FIELDS)
+
+
+def _backtest_payload(data_field: str) -> dict:
+    """Build a valid backtest payload for the given data_field."""
+    return {
+        "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-01-01"},
+        "portfolio_creation": {"filter_type": "TopN", "n": 5, "data_field": data_field},
+        "weighting_scheme": {"weighting_type": "Equal"},
+    }
+
+
+@pytest.fixture
+def post():
+    """Bound POST to the structured backtest endpoint."""
+    return functools.partial(client.post, "/api/v1/backtest")
+
+
+@pytest.fixture
+def post_prompt():
+    """Bound POST to the prompt backtest endpoint."""
+    return functools.partial(client.post, "/api/v1/backtest-prompt")
+
+
+@pytest.fixture
+async def async_client():
+    """Async client bound to the app, for fanning out independent requests."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as ac:
+        yield ac
+
 
 class TestBacktestEndpointEdgeCases:
     """Test edge cases for /api/v1/backtest endpoint."""
 
-    def test_missing_portfolio_creation(self):
+    def test_missing_portfolio_creation(self, post):
         """Test request missing portfolio_creation field."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
         assert "portfolio_creation" in response.text.lower()
 
-    def test_missing_weighting_scheme(self):
+    def test_missing_weighting_scheme(self, post):
         """Test request missing weighting_scheme field."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -28,11 +77,11 @@ class TestBacktestEndpointEdgeCases:
                 "data_field": "market_capitalization",
             },
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
         assert "weighting_scheme" in response.text.lower()
 
-    def test_missing_calendar_rules(self):
+    def test_missing_calendar_rules(self, post):
         """Test request missing calendar_rules field."""
         payload = {
             "portfolio_creation": {
@@ -42,11 +91,11 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
         assert "calendar_rules" in response.text.lower()
 
-    def test_missing_initial_date_in_calendar_rules(self):
+    def test_missing_initial_date_in_calendar_rules(self, post):
         """Test calendar_rules missing initial_date."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly"},
@@ -57,11 +106,11 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
         assert "initial_date" in response.text.lower()
 
-    def test_invalid_rule_type(self):
+    def test_invalid_rule_type(self, post):
         """Test invalid rule_type value."""
         payload = {
             "calendar_rules": {
@@ -75,10 +124,10 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_invalid_filter_type(self):
+    def test_invalid_filter_type(self, post):
         """Test invalid filter_type value."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -89,10 +138,10 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_invalid_weighting_type(self):
+    def test_invalid_weighting_type(self, post):
         """Test invalid weighting_type value."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -105,25 +154,16 @@ class TestBacktestEndpointEdgeCases:
                 "weighting_type": "MAX"  # Invalid - only Equal supported
             },
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_invalid_data_field(self):
-        """Test invalid data_field value."""
-        payload = {
-            "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
-            "portfolio_creation": {
-                "filter_type": "TopN",
-                "n": 10,
-                "data_field": "profit",  # Invalid field
-            },
-            "weighting_scheme": {"weighting_type": "Equal"},
-        }
-        response = client.post("/api/v1/backtest", json=payload)
+    def test_bad_data_field(self, post, bad_data_field):
+        """Test invalid, SQL injection and path traversal data_field values."""
+        response = post(json=_backtest_payload(bad_data_field))
         assert response.status_code == 422
         assert "data_field" in response.text.lower()
 
-    def test_negative_n_value(self):
+    def test_negative_n_value(self, post):
         """Test negative n value."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -134,11 +174,11 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         # Should either reject or handle gracefully
         assert response.status_code in [400, 422]
 
-    def test_zero_n_value(self):
+    def test_zero_n_value(self, post):
         """Test zero n value."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -149,10 +189,10 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code in [400, 422]
 
-    def test_invalid_date_format(self):
+    def test_invalid_date_format(self, post):
         """Test invalid date format."""
         payload = {
             "calendar_rules": {
@@ -166,10 +206,10 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_future_date(self):
+    def test_future_date(self, post):
         """Test date in the future."""
         payload = {
             "calendar_rules": {
@@ -183,11 +223,11 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         # Should handle gracefully - might succeed or fail depending on data
         assert response.status_code in [200, 400]
 
-    def test_very_old_date(self):
+    def test_very_old_date(self, post):
         """Test very old date before data availability."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "1900-01-01"},
@@ -198,25 +238,25 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code in [200, 400]
 
-    def test_empty_payload(self):
+    def test_empty_payload(self, post):
         """Test completely empty payload."""
-        response = client.post("/api/v1/backtest", json={})
+        response = post(json={})
         assert response.status_code == 422
 
-    def test_null_values(self):
+    def test_null_values(self, post):
         """Test null values in required fields."""
         payload = {
             "calendar_rules": None,
             "portfolio_creation": None,
             "weighting_scheme": None,
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_extra_fields(self):
+    def test_extra_fields(self, post):
         """Test payload with extra unexpected fields."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -228,11 +268,11 @@ class TestBacktestEndpointEdgeCases:
             "weighting_scheme": {"weighting_type": "Equal"},
             "extra_field": "should be ignored",
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         # Pydantic should ignore extra fields by default
         assert response.status_code in [200, 400]
 
-    def test_string_instead_of_integer_n(self):
+    def test_string_instead_of_integer_n(self, post):
         """Test string value for n field."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
@@ -243,38 +283,10 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
-        assert response.status_code == 422
-
-    def test_sql_injection_in_data_field(self):
-        """Test SQL injection attempt in data_field."""
-        payload = {
-            "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
-            "portfolio_creation": {
-                "filter_type": "TopN",
-                "n": 10,
-                "data_field": "market_capitalization; DROP TABLE users;",
-            },
-            "weighting_scheme": {"weighting_type": "Equal"},
-        }
-        response = client.post("/api/v1/backtest", json=payload)
-        assert response.status_code == 422
-
-    def test_path_traversal_in_data_field(self):
-        """Test path traversal attempt in data_field."""
-        payload = {
-            "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-11-25"},
-            "portfolio_creation": {
-                "filter_type": "TopN",
-                "n": 10,
-                "data_field": "../../../etc/passwd",
-            },
-            "weighting_scheme": {"weighting_type": "Equal"},
-        }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         assert response.status_code == 422
 
-    def test_valid_request_all_fields(self):
+    def test_valid_request_all_fields(self, post):
         """Test valid request with all required fields."""
         payload = {
             "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2024-01-01"},
@@ -285,7 +297,7 @@ class TestBacktestEndpointEdgeCases:
             },
             "weighting_scheme": {"weighting_type": "Equal"},
         }
-        response = client.post("/api/v1/backtest", json=payload)
+        response = post(json=payload)
         # Should succeed or fail gracefully depending on data availability
         assert response.status_code in [200, 400]
         if response.status_code == 200:
@@ -294,120 +306,108 @@ class TestBacktestEndpointEdgeCases:
             assert "metadata" in data
             assert "execution_time" in data
 
-    def test_all_valid_data_fields(self):
+    async def test_all_valid_data_fields(self, async_client):
         """Test all valid data_field values."""
-        valid_fields = ["market_capitalization", "prices", "volume", "adtv_3_month"]
-
-        for field in valid_fields:
-            payload = {
-                "calendar_rules": {
-                    "rule_type": "Quarterly",
-                    "initial_date": "2024-01-01",
-                },
-                "portfolio_creation": {
-                    "filter_type": "TopN",
-                    "n": 5,
-                    "data_field": field,
-                },
-                "weighting_scheme": {"weighting_type": "Equal"},
-            }
-            response = client.post("/api/v1/backtest", json=payload)
+        payloads = [_backtest_payload(field) for field in VALID_DATA_FIELDS]
+        responses = await asyncio.gather(
+            *(async_client.post("/api/v1/backtest", json=p) for p in payloads)
+        )
+        for field, response in zip(VALID_DATA_FIELDS, responses, strict=True):
             assert response.status_code in [200, 400], f"Failed for field: {field}"
 
 
 class TestBacktestPromptEndpointEdgeCases:
     """Test edge cases for /api/v1/backtest-prompt endpoint."""
 
-    def test_empty_prompt(self):
+    def test_empty_prompt(self, post_prompt):
         """Test empty prompt string."""
         payload = {"prompt": ""}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         assert response.status_code in [400, 422]
 
-    def test_missing_prompt_field(self):
+    def test_missing_prompt_field(self, post_prompt):
         """Test request missing prompt field."""
-        response = client.post("/api/v1/backtest-prompt", json={})
+        response = post_prompt(json={})
         assert response.status_code == 422
 
-    def test_null_prompt(self):
+    def test_null_prompt(self, post_prompt):
         """Test null prompt value."""
         payload = {"prompt": None}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         assert response.status_code == 422
 
-    def test_very_long_prompt(self):
+    def test_very_long_prompt(self, post_prompt):
         """Test extremely long prompt."""
-        payload = {"prompt": "Run backtest " * 1000}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json={"prompt": LONG_PROMPT})
         # Should handle gracefully
         assert response.status_code in [200, 400, 422]
 
-    def test_prompt_with_special_characters(self):
+    def test_prompt_with_special_characters(self, post_prompt):
         """Test prompt with special characters."""
         payload = {"prompt": "Run backtest with @#$%^&*() symbols"}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         assert response.status_code in [200, 400]
 
-    def test_prompt_missing_all_information(self):
+    def test_prompt_missing_all_information(self, post_prompt):
         """Test prompt with minimal information."""
         payload = {"prompt": "Run backtest"}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # LLM should use defaults or fail gracefully
         assert response.status_code in [200, 400]
 
-    def test_prompt_missing_n_value(self):
+    def test_prompt_missing_n_value(self, post_prompt):
         """Test prompt missing number of securities."""
         payload = {
             "prompt": "Run backtest with by market_capitalization starting 2023-06-01"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # Should use default n=10
         assert response.status_code in [200, 400]
 
-    def test_prompt_missing_data_field(self):
+    def test_prompt_missing_data_field(self, post_prompt):
         """Test prompt missing data field."""
         payload = {"prompt": "Run backtest with top 15 securities starting 2023-06-01"}
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # Should use default market_capitalization
         assert response.status_code in [200, 400]
 
-    def test_prompt_missing_date(self):
+    def test_prompt_missing_date(self, post_prompt):
         """Test prompt missing start date."""
         payload = {
             "prompt": "Run backtest with top 15 securities by market_capitalization"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # Should use default date
         assert response.status_code in [200, 400]
 
-    def test_prompt_with_multiple_dates(self):
+    def test_prompt_with_multiple_dates(self, post_prompt):
         """Test prompt with ambiguous multiple dates."""
         payload = {
             "prompt": "Run backtest with top 15 securities. I want to start after my baby born on 20.03.2024. Analyze data starting 2023-06-01 by market_capitalization"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # LLM should pick the most relevant date
         assert response.status_code in [200, 400]
 
-    def test_prompt_with_multiple_n_values(self):
+    def test_prompt_with_multiple_n_values(self, post_prompt):
         """Test prompt with multiple n values."""
         payload = {
             "prompt": "Run backtest with top 15 securities or 50 securities. I have 50 dollars starting 2023-06-01 by market_capitalization"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # LLM should pick one value
         assert response.status_code in [200, 400]
 
-    def test_prompt_with_invalid_data_field(self):
+    def test_prompt_with_invalid_data_field(self, post_prompt):
         """Test prompt requesting invalid data field."""
         payload = {
             "prompt": "Run backtest with top 15 securities starting 2023-06-01 by profit"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # Should fail validation after LLM extraction
         assert response.status_code in [400, 422]
 
-    def test_prompt_with_adtv_variation(self):
+    def test_prompt_with_adtv_variation(self, post_prompt):
         """Test prompt with ADTV variations."""
         prompts = [
             "Run backtest with top 10 securities by ADTV starting 2023-01-01",
@@ -417,35 +417,35 @@ class TestBacktestPromptEndpointEdgeCases:
 
         for prompt_text in prompts:
             payload = {"prompt": prompt_text}
-            response = client.post("/api/v1/backtest-prompt", json=payload)
+            response = post_prompt(json=payload)
             # All should map to adtv_3_month
             assert response.status_code in [200, 400]
 
-    def test_valid_prompt_complete(self):
+    def test_valid_prompt_complete(self, post_prompt):
         """Test valid prompt with all information."""
         payload = {
             "prompt": "Run backtest with top 15 securities by market_capitalization starting 2023-06-01"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         assert response.status_code in [200, 400]
         if response.status_code == 200:
             data = response.json()
             assert "weights" in data
             assert "metadata" in data
 
-    def test_prompt_case_insensitive(self):
+    def test_prompt_case_insensitive(self, post_prompt):
         """Test prompt with different cases."""
         payload = {
             "prompt": "RUN BACKTEST WITH TOP 10 SECURITIES BY MARKET_CAPITALIZATION STARTING 2023-01-01"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         assert response.status_code in [200, 400]
 
-    def test_prompt_with_typos(self):
+    def test_prompt_with_typos(self, post_prompt):
         """Test prompt with common typos."""
         payload = {
             "prompt": "Run backtst with top 10 securites by market_capitalizaton starting 2023-01-01"
         }
-        response = client.post("/api/v1/backtest-prompt", json=payload)
+        response = post_prompt(json=payload)
         # LLM should handle typos
         assert response.status_code in [200, 400]
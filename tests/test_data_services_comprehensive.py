@@ -1,35 +1,77 @@
 import os
-import tempfile
-from pathlib import Path
-from unittest.mock import Mock, patch
+import shutil
+from unittest.mock import patch
 
-import pandas as pd
 import pytest
 
 from app.core.exceptions import DataNotFoundError, FilePermissionError
-from app.db.duckdb_engine import DuckDBEngine
 from app.services.base_data_service import BaseDataService
 from app.services.local_data_service import LocalDataService
 from app.services.s3_data_service import S3DataService
 
 
+@pytest.fixture
+def temp_data_dir(tmp_path):
+    """Per-test data directory; pytest's tmp_path handles naming and cleanup."""
+    return tmp_path
+
+
+@pytest.fixture
+def local_settings():
+    """Patch the settings seen by LocalDataService; tests mutate attributes."""
+    with patch("app.services.local_data_service.settings") as mock_settings:
+        yield mock_settings
+
+
+@pytest.fixture(scope="module")
+def _canned_parquet_bytes():
+    """Encode a tiny single-column parquet once; tests write the bytes out."""
+    import pandas as pd
+
+    return pd.DataFrame({"data": [1, 2, 3]}).to_parquet()
+
+
+@pytest.fixture(scope="module")
+def _canonical_parquet(tmp_path_factory, _canned_parquet_bytes):
+    """Single on-disk parquet that per-test files are hard-linked from."""
+    path = tmp_path_factory.mktemp("canned") / "canonical.parquet"
+    path.write_bytes(_canned_parquet_bytes)
+    return path
+
+
+@pytest.fixture
+def link_parquet(temp_data_dir, _canonical_parquet):
+    """Return a helper that materialises <name>.parquet in temp_data_dir."""
+
+    def link_as(name):
+        path = temp_data_dir.resolve() / f"{name}.parquet"
+        try:
+            os.link(_canonical_parquet, path)
+        except OSError:
+            # Hard links are not available on every filesystem
+            shutil.copyfile(_canonical_parquet, path)
+        return path
+
+    return link_as
+
+
+@pytest.fixture(scope="module")
+def _canned_market_data_bytes():
+    """Encode a small date/security/value parquet once for path lookups."""
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "date": ["2024-01-01", "2024-01-02"],
+            "security": ["AAPL", "MSFT"],
+            "value": [100.0, 150.0],
+        }
+    ).to_parquet(index=False)
+
+
 class TestBaseDataServiceComprehensive:
     """Comprehensive tests for BaseDataService"""
 
-    @pytest.fixture
-    def mock_db_engine(self):
-        mock_engine = Mock(spec=DuckDBEngine)
-        mock_engine.register_parquet_file = Mock()
-        mock_engine.get_data_range = Mock(
-            return_value=(pd.Timestamp("2020-01-01"), pd.Timestamp("2025-01-22"))
-        )
-        mock_engine.filter_data_by_dates = Mock(
-            return_value=pd.DataFrame(
-                {"date": ["2024-01-01"], "security": ["AAPL"], "value": [100.0]}
-            )
-        )
-        return mock_engine
-
     @pytest.fixture
     def concrete_service(self, mock_db_engine):
         class ConcreteService(BaseDataService):
@@ -39,60 +81,44 @@ class TestBaseDataServiceComprehensive:
         return ConcreteService(db_engine=mock_db_engine)
 
 
+@pytest.mark.usefixtures("local_settings")
 class TestLocalDataServiceComprehensive:
     """Comprehensive tests for LocalDataService"""
 
     @pytest.fixture
-    def temp_data_dir(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            yield Path(temp_dir)
+    def local_service(self, local_settings, temp_data_dir):
+        local_settings.LOCAL_DATA_DIR = str(temp_data_dir)
+        return LocalDataService()
 
     @pytest.fixture
-    def local_service(self, temp_data_dir):
-        with patch("app.services.local_data_service.settings") as mock_settings:
-            mock_settings.LOCAL_DATA_DIR = str(temp_data_dir)
-            service = LocalDataService()
-            return service
-
-    @pytest.fixture
-    def sample_parquet_file(self, temp_data_dir):
+    def sample_parquet_file(self, temp_data_dir, _canned_market_data_bytes):
         file_path = temp_data_dir / "market_capitalization.parquet"
-        df = pd.DataFrame(
-            {
-                "date": ["2024-01-01", "2024-01-02"],
-                "security": ["AAPL", "MSFT"],
-                "value": [100.0, 150.0],
-            }
-        )
-        df.to_parquet(file_path, index=False)
-        return file_path
-
-    def test_initialization_success(self, temp_data_dir):
+        file_path.write_bytes(_canned_market_data_bytes)
+        return file_path.resolve()
+
+    def test_initialization_success(self, local_settings, temp_data_dir):
         """Test successful initialization"""
-        with patch("app.services.local_data_service.settings") as mock_settings:
-            mock_settings.LOCAL_DATA_DIR = str(temp_data_dir)
-            service = LocalDataService()
-            # Compares resolved paths to handle symlinks like /private/var on macOS
-            assert service.data_dir.resolve() == Path(temp_data_dir).resolve()
+        local_settings.LOCAL_DATA_DIR = str(temp_data_dir)
+        service = LocalDataService()
+        # data_dir is already resolved; resolving the expected side handles
+        # symlinks like /private/var on macOS
+        assert service.data_dir == temp_data_dir.resolve()
 
-    def test_initialization_permission_error(self):
+    def test_initialization_permission_error(self, local_settings):
         """Test initialization with permission error"""
+        local_settings.LOCAL_DATA_DIR = "/root/protected"
+
         with patch("pathlib.Path.mkdir") as mock_mkdir:
             mock_mkdir.side_effect = PermissionError("Permission denied")
 
-            with patch("app.services.local_data_service.settings") as mock_settings:
-                mock_settings.LOCAL_DATA_DIR = "/root/protected"
-
-                with pytest.raises(
-                    DataNotFoundError, match="Cannot create data directory"
-                ):
-                    LocalDataService()
+            with pytest.raises(DataNotFoundError, match="Cannot create data directory"):
+                LocalDataService()
 
     def test_get_data_path_success(self, local_service, sample_parquet_file):
         """Test successful data path retrieval"""
         result = local_service.get_data_path("market_capitalization")
-        # Uses resolved paths for comparison to handle macOS /private/var symlinks
-        assert Path(result).resolve() == sample_parquet_file.resolve()
+        # LocalDataService returns a canonical path; the fixture is pre-resolved
+        assert result == str(sample_parquet_file)
 
     def test_get_data_path_file_not_found(self, local_service):
         """Tests data path with non-existent file"""
@@ -134,62 +160,43 @@ class TestLocalDataServiceComprehensive:
 
         # Should return the path (validation happens in DuckDB during registration)
         result_path = local_service.get_data_path("wrong_extension")
-        assert Path(result_path).resolve() == wrong_file.resolve()
+        assert result_path == str(wrong_file.resolve())
 
     def test_get_data_path_permission_denied(self, local_service, temp_data_dir):
         """Test data path with permission denied"""
-        if os.name == "nt":
-            pytest.skip("Permission tests not reliable on Windows")
+        (temp_data_dir / "protected.parquet").touch()
 
-        protected_file = temp_data_dir / "protected.parquet"
-        df = pd.DataFrame({"data": [1, 2, 3]})
-        df.to_parquet(protected_file)
-        protected_file.chmod(0o000)  # No permissions
-
-        try:
+        # Simulate an unreadable file at the os.access boundary the service checks
+        with patch("app.services.local_data_service.os.access", return_value=False):
             with pytest.raises(FilePermissionError):
                 local_service.get_data_path("protected")
-        finally:
-            protected_file.chmod(0o644)  # Restore permissions
 
-    def test_get_data_path_invalid_field_name(self, local_service):
+    @pytest.mark.parametrize(
+        "field_name,error",
+        [
+            ("", "Field name must be a non-empty string"),
+            (None, "Field name must be a non-empty string"),
+            ("../sensitive_file", "Invalid field name"),  # Path traversal
+            ("file;.parquet", "Invalid field name"),  # Special characters
+        ],
+    )
+    def test_get_data_path_invalid_field_name(self, local_service, field_name, error):
         """Test data path with invalid field names"""
-        # Test empty field name
-        with pytest.raises(
-            DataNotFoundError, match="Field name must be a non-empty string"
-        ):
-            local_service.get_data_path("")
-
-        # Test None field name
-        with pytest.raises(
-            DataNotFoundError, match="Field name must be a non-empty string"
-        ):
-            local_service.get_data_path(None)
-
-        # Test field name with path traversal
-        with pytest.raises(DataNotFoundError, match="Invalid field name"):
-            local_service.get_data_path("../sensitive_file")
-
-        # Test field name with special characters
-        with pytest.raises(DataNotFoundError, match="Invalid field name"):
-            local_service.get_data_path("file;.parquet")
-
-    def test_get_data_path_valid_special_characters(self, local_service, temp_data_dir):
+        with pytest.raises(DataNotFoundError, match=error):
+            local_service.get_data_path(field_name)
+
+    @pytest.mark.parametrize(
+        "field_name", ["market_cap", "adtv-3-month", "price.data.2024"]
+    )
+    def test_get_data_path_valid_special_characters(
+        self, local_service, link_parquet, field_name
+    ):
         """Test data path with valid special characters in field name"""
-        valid_names = ["market_cap", "adtv-3-month", "price.data.2024"]
+        file_path = link_parquet(field_name)
 
-        for field_name in valid_names:
-            file_path = temp_data_dir / f"{field_name}.parquet"
-            df = pd.DataFrame({"data": [1, 2, 3]})
-            df.to_parquet(file_path)
+        assert local_service.get_data_path(field_name) == str(file_path)
 
-            try:
-                result = local_service.get_data_path(field_name)
-                assert Path(result).resolve() == file_path.resolve()
-            finally:
-                file_path.unlink()
-
-    def test_environment_specific_paths(self, temp_data_dir):
+    def test_environment_specific_paths(self, local_settings, temp_data_dir):
         """Test path resolution in different environments"""
         test_cases = [
             ("./data", temp_data_dir),
@@ -197,26 +204,28 @@ class TestLocalDataServiceComprehensive:
         ]
 
         for input_path, _expected_path in test_cases:
-            with patch("app.services.local_data_service.settings") as mock_settings:
-                mock_settings.LOCAL_DATA_DIR = input_path
+            local_settings.LOCAL_DATA_DIR = input_path
 
-                with patch("pathlib.Path.mkdir"):
-                    service = LocalDataService()
-                    # The path should be resolved to absolute path
-                    assert service.data_dir.is_absolute()
+            with patch("pathlib.Path.mkdir"):
+                service = LocalDataService()
+                # The path should be resolved to absolute path
+                assert service.data_dir.is_absolute()
 
 
 class TestS3DataServiceComprehensive:
     """Comprehensive tests for S3DataService"""
 
-    @pytest.fixture
+    # get_data_path only reads bucket, so one instance serves the whole class
+    @pytest.fixture(scope="class")
     def s3_service(self):
         with patch("app.services.s3_data_service.settings") as mock_settings:
             mock_settings.S3_BUCKET = "test-bucket"
             mock_settings.AWS_REGION = "us-east-1"
-            return S3DataService()
+            service = S3DataService()
+        yield service
+        service.db_engine.close()
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def s3_service_no_bucket(self):
         with patch("app.services.s3_data_service.settings") as mock_settings:
             mock_settings.S3_BUCKET = ""
@@ -257,88 +266,64 @@ class TestS3DataServiceComprehensive:
         with pytest.raises(DataNotFoundError, match="S3 bucket not configured"):
             s3_service_no_bucket.get_data_path("test_field")
 
-    def test_get_data_path_invalid_field_name(self, s3_service):
+    @pytest.mark.parametrize(
+        "field_name,error",
+        [
+            ("", "Field name must be a non-empty string"),
+            (None, "Field name must be a non-empty string"),
+            ("file;.parquet", "Invalid field name"),  # Invalid characters
+        ],
+    )
+    def test_get_data_path_invalid_field_name(self, s3_service, field_name, error):
         """Test S3 path with invalid field names"""
-        # Test empty field name
-        with pytest.raises(
-            DataNotFoundError, match="Field name must be a non-empty string"
-        ):
-            s3_service.get_data_path("")
-
-        # Test None field name
-        with pytest.raises(
-            DataNotFoundError, match="Field name must be a non-empty string"
-        ):
-            s3_service.get_data_path(None)
+        with pytest.raises(DataNotFoundError, match=error):
+            s3_service.get_data_path(field_name)
 
-        # Test field name with invalid characters
-        with pytest.raises(DataNotFoundError, match="Invalid field name"):
-            s3_service.get_data_path("file;.parquet")
-
-    def test_get_data_path_valid_special_characters(self, s3_service):
+    @pytest.mark.parametrize(
+        "field_name", ["market_cap", "adtv-3-month", "price.data.2024"]
+    )
+    def test_get_data_path_valid_special_characters(self, s3_service, field_name):
         """Test S3 path with valid special characters"""
-        valid_names = ["market_cap", "adtv-3-month", "price.data.2024"]
-
-        for field_name in valid_names:
-            result = s3_service.get_data_path(field_name)
-            expected = f"s3://test-bucket/{field_name}.parquet"
-            assert result == expected
+        result = s3_service.get_data_path(field_name)
+        assert result == f"s3://test-bucket/{field_name}.parquet"
 
-    def test_s3_path_edge_cases(self, s3_service):
-        """Test S3 path construction with edge cases"""
-        test_cases = [
+    @pytest.mark.parametrize(
+        "field_name,expected",
+        [
             ("a", "s3://test-bucket/a.parquet"),  # Single character
             (
                 "very_long_field_name_that_is_still_valid",
                 "s3://test-bucket/very_long_field_name_that_is_still_valid.parquet",
             ),
             ("mixedCase", "s3://test-bucket/mixedCase.parquet"),  # Mixed case
-        ]
-
-        for field_name, expected in test_cases:
-            result = s3_service.get_data_path(field_name)
-            assert result == expected
+        ],
+    )
+    def test_s3_path_edge_cases(self, s3_service, field_name, expected):
+        """Test S3 path construction with edge cases"""
+        assert s3_service.get_data_path(field_name) == expected
 
 
 class TestDataServiceIntegration:
     """Integration tests for data services with real configurations"""
 
-    @pytest.fixture
-    def mock_db_engine(self):
-        mock_engine = Mock(spec=DuckDBEngine)
-        mock_engine.register_parquet_file = Mock()
-        mock_engine.get_data_range = Mock(
-            return_value=(pd.Timestamp("2020-01-01"), pd.Timestamp("2025-01-22"))
-        )
-        mock_engine.filter_data_by_dates = Mock(
-            return_value=pd.DataFrame(
-                {"date": ["2024-01-01"], "security": ["AAPL"], "value": [100.0]}
-            )
-        )
-        return mock_engine
-
-    @pytest.fixture
-    def temp_data_dir(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            yield Path(temp_dir)
-
-    def test_development_environment_local_storage(self, mock_db_engine, temp_data_dir):
+    def test_development_environment_local_storage(
+        self, local_settings, mock_db_engine, temp_data_dir
+    ):
         """Test local storage in development environment"""
-        with patch("app.services.local_data_service.settings") as mock_settings:
-            mock_settings.ENV = "development"
-            mock_settings.STORAGE_BACKEND = "local"
-            mock_settings.LOCAL_DATA_DIR = str(temp_data_dir)
+        local_settings.ENV = "development"
+        local_settings.STORAGE_BACKEND = "local"
+        local_settings.LOCAL_DATA_DIR = str(temp_data_dir)
 
-            # Create test file
-            test_file = temp_data_dir / "volume.parquet"
-            pd.DataFrame({"data": [1, 2, 3]}).to_parquet(test_file)
+        # Only existence is checked, so an empty file is enough
+        test_file = temp_data_dir / "volume.parquet"
+        test_file.touch()
 
-            service = LocalDataService(db_engine=mock_db_engine)
+        service = LocalDataService(db_engine=mock_db_engine)
 
-            # Should use local file system
-            result_path = service.get_data_path("volume")
-            assert Path(result_path).resolve() == test_file.resolve()
-            assert "s3://" not in result_path
+        # Should use local file system
+        result_path = service.get_data_path("volume")
+        assert result_path == str(test_file.resolve())
+        assert "s3://" not in result_path
 
     def test_production_environment_s3_storage(self, mock_db_engine):
         """Test S3 storage in production environment"""
@@ -359,47 +344,22 @@ class TestDataServiceIntegration:
 class TestErrorHandlingAndEdgeCases:
     """Test error handling and edge cases"""
 
-    @pytest.fixture
-    def temp_data_dir(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            yield Path(temp_dir)
-
-    def test_unicode_field_names(self, temp_data_dir):
-        """Test handling of unicode field names"""
-        unicode_names = [
+    @pytest.mark.parametrize(
+        "unicode_name",
+        [
             "市场_数据",  # Chinese characters
             "café_price",  # Accented characters
             "naïve_volume",  # More accented characters
-        ]
-
-        with patch("app.services.local_data_service.settings") as mock_settings:
-            mock_settings.LOCAL_DATA_DIR = str(temp_data_dir)
-            service = LocalDataService()
-
-            for unicode_name in unicode_names:
-                # Create the file first
-                file_path = temp_data_dir / f"{unicode_name}.parquet"
-                df = pd.DataFrame({"data": [1, 2, 3]})
-                df.to_parquet(file_path)
-
-                try:
-                    # Should work with unicode names
-                    result_path = service.get_data_path(unicode_name)
-                    assert Path(result_path).resolve() == file_path.resolve()
-                finally:
-                    file_path.unlink()
-
-
-class TestConfigurationValidation:
-    """Test configuration validation"""
-
-    def test_missing_configuration_handling(self):
-        """Test behavior with missing configuration"""
-        # S3 service without bucket
-        with patch("app.services.s3_data_service.settings") as mock_settings:
-            mock_settings.S3_BUCKET = ""
+        ],
+    )
+    def test_unicode_field_names(
+        self, local_settings, temp_data_dir, link_parquet, unicode_name
+    ):
+        """Test handling of unicode field names"""
+        local_settings.LOCAL_DATA_DIR = str(temp_data_dir)
+        service = LocalDataService()
 
-            service = S3DataService()
+        file_path = link_parquet(unicode_name)
 
-            with pytest.raises(DataNotFoundError, match="S3 bucket not configured"):
-                service.get_data_path("test")
+        # Should work with unicode names
+        assert service.get_data_path(unicode_name) == str(file_path)
@@ -1,6 +1,6 @@
 from datetime import date
-from unittest.mock import Mock
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -14,12 +14,41 @@ from app.schemas import (
 )
 
 
+class _StubDataService:
+    """Plain data service double; tests assign data_range and data directly.
+
+    Setting data_range to an exception instance makes get_data_range raise it.
+    """
+
+    def __init__(self, data_range, data=None):
+        self.data_range = data_range
+        self.data = pd.DataFrame() if data is None else data
+
+    def get_data_range(self, field_name):
+        if isinstance(self.data_range, Exception):
+            raise self.data_range
+        return self.data_range
+
+    def get_data_for_dates(self, field_name, target_dates):
+        return self.data
+
+
+@pytest.fixture(scope="module")
+def mock_backtest_df():
+    """Per-date security values, built once from typed arrays for the module."""
+    return pd.DataFrame(
+        np.array([[100.0, 150.0, 120.0], [200.0, 250.0, 220.0]]),
+        columns=["AAPL", "MSFT", "GOOG"],
+        index=pd.DatetimeIndex(
+            np.array(["2024-03-31", "2024-06-30"], dtype="datetime64[D]")
+        ),
+    )
+
+
 class TestBacktestEngine:
     @pytest.fixture
     def mock_data_service(self):
-        mock_service = Mock()
-        mock_service.get_data_range.return_value = (date(2020, 1, 1), date(2025, 1, 22))
-        return mock_service
+        return _StubDataService((date(2020, 1, 1), date(2025, 1, 22)))
 
     @pytest.fixture
     def backtest_engine(self, mock_data_service):
@@ -38,16 +67,10 @@ class TestBacktestEngine:
         )
 
     def test_run_successful_backtest(
-        self, backtest_engine, mock_data_service, sample_request
+        self, backtest_engine, mock_data_service, sample_request, mock_backtest_df
     ):
         """Test successful backtest execution."""
-        # Mock data for different dates
-        mock_data = pd.DataFrame(
-            {"AAPL": [100.0, 200.0], "MSFT": [150.0, 250.0], "GOOG": [120.0, 220.0]},
-            index=pd.to_datetime(["2024-03-31", "2024-06-30"]),
-        )
-
-        mock_data_service.get_data_for_dates.return_value = mock_data
+        mock_data_service.data = mock_backtest_df
 
         weights, metrics, warnings = backtest_engine.run(sample_request)
 
@@ -62,7 +85,7 @@ class TestBacktestEngine:
         self, backtest_engine, mock_data_service, sample_request
     ):
         """Test backtest with no data available."""
-        mock_data_service.get_data_for_dates.return_value = pd.DataFrame()  # Empty data
+        mock_data_service.data = pd.DataFrame()  # Empty data
 
         weights, metrics, warnings = backtest_engine.run(sample_request)
 
@@ -74,10 +97,7 @@ class TestBacktestEngine:
         self, backtest_engine, mock_data_service, sample_request
     ):
         """Test backtest with date outside available range."""
-        mock_data_service.get_data_range.return_value = (
-            date(2024, 6, 1),
-            date(2024, 6, 30),
-        )
+        mock_data_service.data_range = (date(2024, 6, 1), date(2024, 6, 30))
 
         with pytest.raises(CalendarRuleError):
             backtest_engine.run(sample_request)
@@ -86,9 +106,7 @@ class TestBacktestEngine:
         self, backtest_engine, mock_data_service, sample_request
     ):
         """Test backtest when data service raises exception."""
-        mock_data_service.get_data_range.side_effect = DataNotFoundError(
-            "Data file not found"
-        )
+        mock_data_service.data_range = DataNotFoundError("Data file not found")
 
         with pytest.raises(DataNotFoundError):
             backtest_engine.run(sample_request)
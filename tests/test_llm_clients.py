@@ -1,4 +1,6 @@
+import functools
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
@@ -7,221 +9,137 @@ import pytest
 from app.core.exceptions import PromptParsingError
 from app.services.gemini_chat_client import GeminiChatClient
 from app.services.openai_chat_client import OpenAIChatClient
-
-
-class TestOpenAIChatClient:
-    @pytest.fixture
-    def openai_client(self):
-        return OpenAIChatClient(
-            api_key="test-key",
-            model="gpt-4",
-            api_url="https://api.openai.com/v1/chat/completions",
-            timeout=30,
-        )
-
-    @pytest.mark.asyncio
-    async def test_openai_successful_response(self, openai_client):
-        """Test successful OpenAI API call."""
-        mock_response_data = {
-            "choices": [
-                {
-                    "message": {
-                        "content": json.dumps(
-                            {
-                                "calendar_rules": {
-                                    "rule_type": "Quarterly",
-                                    "initial_date": "2023-01-01",
-                                },
-                                "portfolio_creation": {
-                                    "filter_type": "TopN",
-                                    "n": 10,
-                                    "data_field": "market_capitalization",
-                                },
-                                "weighting_scheme": {"weighting_type": "Equal"},
-                            }
-                        )
-                    }
-                }
-            ]
-        }
-
-        # Create a proper async mock response
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        # Make json() return the data directly (not a coroutine)
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            openai_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
-
-            result = await openai_client.generate_json("test prompt")
+from app.services.openllm_chat_client import OpenLLMChatClient
+
+SUCCESS_PAYLOAD = {
+    "calendar_rules": {"rule_type": "Quarterly", "initial_date": "2023-01-01"},
+    "portfolio_creation": {
+        "filter_type": "TopN",
+        "n": 10,
+        "data_field": "market_capitalization",
+    },
+    "weighting_scheme": {"weighting_type": "Equal"},
+}
+
+
+@functools.cache
+def _success_content():
+    """SUCCESS_PAYLOAD serialized on first use, then reused by every client."""
+    return json.dumps(SUCCESS_PAYLOAD)
+
+
+def _openai_body(content):
+    """OpenAI-compatible completion body (OpenAI and OpenLLM)."""
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def _gemini_body(content):
+    """Gemini generateContent body."""
+    return {"candidates": [{"content": {"parts": [{"text": content}]}}]}
+
+
+# client id -> (client class, constructor kwargs, response body builder)
+CLIENTS = {
+    "openai": (
+        OpenAIChatClient,
+        {
+            "model": "gpt-4",
+            "api_url": "https://api.openai.com/v1/chat/completions",
+        },
+        _openai_body,
+    ),
+    "gemini": (
+        GeminiChatClient,
+        {
+            "model": "gemini-pro",
+            "api_url": "https://generativelanguage.googleapis.com/v1beta",
+        },
+        _gemini_body,
+    ),
+    "openllm": (
+        OpenLLMChatClient,
+        {
+            "model": "test-model",
+            "api_url": "http://localhost:1234/v1/chat/completions",
+        },
+        _openai_body,
+    ),
+}
+
+# Structurally invalid bodies, keyed by the client they target
+MALFORMED_BODIES = [
+    pytest.param("openai", {"invalid_structure": "no choices field"}, id="openai"),
+    pytest.param("gemini", {"invalid_structure": "no candidates field"}, id="gemini"),
+    pytest.param("gemini", {"candidates": []}, id="gemini-empty-candidates"),
+    pytest.param(
+        "gemini",
+        {"candidates": [{"content": {"missing_parts": "no parts field"}}]},
+        id="gemini-missing-parts",
+    ),
+    pytest.param("openllm", {"invalid_structure": "no choices field"}, id="openllm"),
+]
+
+
+@pytest.fixture(scope="session", params=list(CLIENTS))
+async def chat_client(request):
+    """One client per provider and session, with its response body builder.
+
+    Each test patches client.post itself.
+    """
+    client_cls, kwargs, build_body = CLIENTS[request.param]
+    client = client_cls(api_key="test-key", timeout=30, **kwargs)
+    yield client, build_body
+    await client.close()
+
+
+def _mock_response(data):
+    """Bare 200 response; the clients only call raise_for_status() and json()."""
+    return SimpleNamespace(
+        status_code=200, json=lambda: data, raise_for_status=lambda: None
+    )
+
+
+class TestChatClients:
+    async def test_successful_response(self, chat_client):
+        """Test successful API call."""
+        client, build_body = chat_client
+        with patch.object(client.client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = _mock_response(build_body(_success_content()))
+
+            result = await client.generate_json("test prompt")
 
             assert result["calendar_rules"]["rule_type"] == "Quarterly"
             assert result["portfolio_creation"]["n"] == 10
             mock_post.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_openai_http_error(self, openai_client):
-        """Test OpenAI API HTTP error."""
-        # Create a mock that raises HTTP error immediately
-        with patch.object(
-            openai_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
+    async def test_http_error(self, chat_client):
+        """Test API HTTP error."""
+        client, _ = chat_client
+        with patch.object(client.client, "post", new_callable=AsyncMock) as mock_post:
             mock_post.side_effect = httpx.HTTPStatusError(
                 "Error", request=Mock(), response=Mock(status_code=500)
             )
 
             with pytest.raises(PromptParsingError):
-                await openai_client.generate_json("test prompt")
-
-    @pytest.mark.asyncio
-    async def test_openai_invalid_json_response(self, openai_client):
-        """Test OpenAI API with invalid JSON response."""
-        mock_response_data = {"choices": [{"message": {"content": "invalid json {"}}]}
-
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            openai_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
-
-            with pytest.raises(PromptParsingError):
-                await openai_client.generate_json("test prompt")
-
-    @pytest.mark.asyncio
-    async def test_openai_missing_choices(self, openai_client):
-        """Test OpenAI API with missing choices in response."""
-        mock_response_data = {"invalid_structure": "no choices field"}
-
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            openai_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
-
-            with pytest.raises(PromptParsingError):
-                await openai_client.generate_json("test prompt")
-
-
-class TestGeminiChatClient:
-    @pytest.fixture
-    def gemini_client(self):
-        return GeminiChatClient(
-            api_key="test-key",
-            model="gemini-pro",
-            api_url="https://generativelanguage.googleapis.com/v1beta",
-            timeout=30,
-        )
-
-    @pytest.mark.asyncio
-    async def test_gemini_successful_response(self, gemini_client):
-        """Test successful Gemini API call."""
-        mock_response_data = {
-            "candidates": [
-                {
-                    "content": {
-                        "parts": [
-                            {
-                                "text": json.dumps(
-                                    {
-                                        "calendar_rules": {
-                                            "rule_type": "Quarterly",
-                                            "initial_date": "2023-01-01",
-                                        },
-                                        "portfolio_creation": {
-                                            "filter_type": "TopN",
-                                            "n": 5,
-                                            "data_field": "volume",
-                                        },
-                                        "weighting_scheme": {"weighting_type": "Equal"},
-                                    }
-                                )
-                            }
-                        ]
-                    }
-                }
-            ]
-        }
-
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            gemini_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
-
-            result = await gemini_client.generate_json("test prompt")
-
-            assert result["portfolio_creation"]["data_field"] == "volume"
-            assert result["portfolio_creation"]["n"] == 5
-            mock_post.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_gemini_missing_candidates(self, gemini_client):
-        """Test Gemini API with missing candidates in response."""
-        mock_response_data = {"invalid_structure": "no candidates field"}
+                await client.generate_json("test prompt")
 
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            gemini_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
+    async def test_invalid_json_response(self, chat_client):
+        """Test API with invalid JSON content."""
+        client, build_body = chat_client
+        with patch.object(client.client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = _mock_response(build_body("invalid json {"))
 
             with pytest.raises(PromptParsingError):
-                await gemini_client.generate_json("test prompt")
-
-    @pytest.mark.asyncio
-    async def test_gemini_empty_candidates(self, gemini_client):
-        """Test Gemini API with empty candidates array."""
-        mock_response_data = {"candidates": []}
-
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
-
-        with patch.object(
-            gemini_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
-
-            with pytest.raises(PromptParsingError):
-                await gemini_client.generate_json("test prompt")
-
-    @pytest.mark.asyncio
-    async def test_gemini_missing_parts(self, gemini_client):
-        """Test Gemini API with missing parts in candidate."""
-        mock_response_data = {
-            "candidates": [{"content": {"missing_parts": "no parts field"}}]
-        }
-
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json = Mock(return_value=mock_response_data)
-        mock_response.raise_for_status = Mock()
+                await client.generate_json("test prompt")
 
-        with patch.object(
-            gemini_client.client, "post", new_callable=AsyncMock
-        ) as mock_post:
-            mock_post.return_value = mock_response
+    @pytest.mark.parametrize(
+        "chat_client, body", MALFORMED_BODIES, indirect=["chat_client"]
+    )
+    async def test_malformed_response(self, chat_client, body):
+        """Test API with a response missing required fields."""
+        client, _ = chat_client
+        with patch.object(client.client, "post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = _mock_response(body)
 
             with pytest.raises(PromptParsingError):
-                await gemini_client.generate_json("test prompt")
+                await client.generate_json("test prompt")
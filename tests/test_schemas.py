@@ -8,7 +8,6 @@ from app.schemas import (
     BacktestRequest,
     CalendarRules,
     PortfolioCreation,
-    WeightingScheme,
 )
 
 logger = logging.getLogger(__name__)
@@ -36,14 +35,9 @@ def test_portfolio_creation_valid():
     assert filter_obj.n == 50
 
 
-def test_backtest_request_valid():
+def test_backtest_request_valid(valid_request_dict):
     """Test valid BacktestRequest construction"""
-    req = BacktestRequest(
-        calendar_rules=CalendarRules(rule_type="Quarterly", initial_date="2024-01-01"),
-        portfolio_creation=PortfolioCreation(
-            filter_type="TopN", n=10, data_field="volume"
-        ),
-        weighting_scheme=WeightingScheme(weighting_type="Equal"),
-    )
+    req = BacktestRequest(**valid_request_dict)
     assert isinstance(req.calendar_rules, CalendarRules)
+    assert req.calendar_rules.initial_date == date(2023, 1, 1)
     assert req.portfolio_creation.n == 10
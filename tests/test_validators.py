@@ -1,30 +1,26 @@
 import pytest
 
-from app.utils.validators import validate_data_field
+from app.utils.validators import ALLOWED_DATA_FIELDS, validate_data_field
 
 
 class TestValidateDataField:
     """Test suite for data_field validator."""
 
-    def test_valid_market_capitalization(self):
-        """Test valid market_capitalization field."""
-        result = validate_data_field("market_capitalization")
-        assert result == "market_capitalization"
-
-    def test_valid_prices(self):
-        """Test valid prices field."""
-        result = validate_data_field("prices")
-        assert result == "prices"
-
-    def test_valid_volume(self):
-        """Test valid volume field."""
-        result = validate_data_field("volume")
-        assert result == "volume"
-
-    def test_valid_adtv_3_month(self):
-        """Test valid adtv_3_month field."""
-        result = validate_data_field("adtv_3_month")
-        assert result == "adtv_3_month"
+    @pytest.mark.parametrize(
+        "field", ["market_capitalization", "prices", "volume", "adtv_3_month"]
+    )
+    def test_valid(self, field):
+        """Test that each allowed field is returned unchanged."""
+        assert validate_data_field(field) == field
+
+    def test_allowed_data_fields(self):
+        """Test the public allowed-field list, in error-message order."""
+        assert ALLOWED_DATA_FIELDS == (
+            "market_capitalization",
+            "prices",
+            "volume",
+            "adtv_3_month",
+        )
 
     def test_invalid_field_raises_value_error(self):
         """Test that invalid field raises ValueError."""
@@ -44,57 +40,49 @@ class TestValidateDataField:
 
         assert "Invalid data_field" in str(exc_info.value)
 
-    def test_case_sensitive(self):
+    @pytest.mark.parametrize("field", ["Market_Capitalization", "PRICES"])
+    def test_case_sensitive(self, field):
         """Test that validation is case-sensitive."""
         with pytest.raises(ValueError):
-            validate_data_field("Market_Capitalization")
-
-        with pytest.raises(ValueError):
-            validate_data_field("PRICES")
+            validate_data_field(field)
 
-    def test_whitespace_not_allowed(self):
+    @pytest.mark.parametrize("field", ["market capitalization", " prices", "volume "])
+    def test_whitespace_not_allowed(self, field):
         """Test that fields with whitespace are rejected."""
         with pytest.raises(ValueError):
-            validate_data_field("market capitalization")
-
-        with pytest.raises(ValueError):
-            validate_data_field(" prices")
-
-        with pytest.raises(ValueError):
-            validate_data_field("volume ")
+            validate_data_field(field)
 
-    def test_partial_match_not_allowed(self):
+    @pytest.mark.parametrize("field", ["market", "adtv"])
+    def test_partial_match_not_allowed(self, field):
         """Test that partial matches are not accepted."""
         with pytest.raises(ValueError):
-            validate_data_field("market")
-
-        with pytest.raises(ValueError):
-            validate_data_field("adtv")
+            validate_data_field(field)
 
     def test_sql_injection_attempt(self):
         """Test that SQL injection attempts are rejected."""
         with pytest.raises(ValueError):
             validate_data_field("prices; DROP TABLE users;")
 
-    def test_path_traversal_attempt(self):
+    @pytest.mark.parametrize(
+        "field", ["../../../etc/passwd", "..\\..\\windows\\system32"]
+    )
+    def test_path_traversal_attempt(self, field):
         """Test that path traversal attempts are rejected."""
         with pytest.raises(ValueError):
-            validate_data_field("../../../etc/passwd")
-
-        with pytest.raises(ValueError):
-            validate_data_field("..\\..\\windows\\system32")
+            validate_data_field(field)
 
-    def test_special_characters_rejected(self):
-        """Test that special characters are rejected."""
-        invalid_inputs = [
+    @pytest.mark.parametrize(
+        "bad",
+        [
             "prices@domain.com",
             "volume#123",
             "market$cap",
             "data%field",
             "field&name",
             "test*field",
-        ]
-
-        for invalid_input in invalid_inputs:
-            with pytest.raises(ValueError):
-                validate_data_field(invalid_input)
+        ],
+    )
+    def test_special_characters_rejected(self, bad):
+        """Test that special characters are rejected."""
+        with pytest.raises(ValueError):
+            validate_data_field(bad)